@@ -4,59 +4,162 @@ import socketserver
 import socket
 import argparse
 import os
+import errno
 import sys
+import signal
 import mimetypes
 
 
+# Ensure proper MIME types
+mimetypes.add_type('application/wasm', '.wasm')
+mimetypes.add_type('application/octet-stream', '.data')
+
+# Basic CSP aligned with _headers (relaxed for localhost if needed)
+_CSP = (
+    "default-src 'self'; "
+    "connect-src 'self' https://*.supabase.co; "
+    "img-src 'self' data:; "
+    # Allow esm.sh for CodeMirror fallback in dev only
+    "script-src 'self' 'wasm-unsafe-eval' 'unsafe-eval' https://esm.sh; "
+    "style-src 'self' 'unsafe-inline'; "
+    "worker-src 'self' blob:; "
+    "frame-ancestors 'none'"
+)
+
+_STATIC_HEADERS = (
+    # Always good hygiene
+    ('X-Content-Type-Options', 'nosniff'),
+    ('Content-Security-Policy', _CSP),
+)
+
+
+def _isolated_headers(coep_policy):
+    # Cross-origin isolation headers for WASM/SharedArrayBuffer
+    return (
+        ('Cross-Origin-Opener-Policy', 'same-origin'),
+        ('Cross-Origin-Embedder-Policy', coep_policy),
+        # Mark same-origin assets as embeddable
+        ('Cross-Origin-Resource-Policy', 'same-origin'),
+    )
+
+
+def _encode_headers(headers):
+    # Pre-encoded "Name: value\r\n" lines
+    return b''.join(f'{keyword}: {value}\r\n'.encode('latin-1') for keyword, value in headers)
+
+
 class Handler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, isolated=False, coep_policy='credentialless', **kwargs):
-        self.isolated = isolated
-        self.coep_policy = coep_policy
-        # Ensure proper MIME types
-        mimetypes.add_type('application/wasm', '.wasm')
-        mimetypes.add_type('application/octet-stream', '.data')
-        super().__init__(*args, **kwargs)
+    # Keep-alive: the browser reuses a few connections (and thus handler
+    # threads) for the whole burst of JS/WASM chunks instead of one per file.
+    protocol_version = 'HTTP/1.1'
+    # Buffer wfile so headers and small bodies go out in one send()
+    wbufsize = 64 * 1024
+
+    # Extra headers appended to every response; IsolatedHandler adds COOP/COEP
+    _HEADERS_BLOB = _encode_headers(_STATIC_HEADERS)
+
+    def setup(self):
+        super().setup()
+        # Don't let Nagle hold back small header/JS responses; bigger send
+        # buffer means fewer syscalls when streaming WASM payloads.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 256 * 1024)
 
     def end_headers(self):
-        # Always good hygiene
-        self.send_header('X-Content-Type-Options', 'nosniff')
-
-        if self.isolated:
-            # Cross-origin isolation headers for WASM/SharedArrayBuffer
-            self.send_header('Cross-Origin-Opener-Policy', 'same-origin')
-            self.send_header('Cross-Origin-Embedder-Policy', self.coep_policy)
-            # Mark same-origin assets as embeddable
-            self.send_header('Cross-Origin-Resource-Policy', 'same-origin')
-
-        # Basic CSP aligned with _headers (relaxed for localhost if needed)
-        csp = (
-            "default-src 'self'; "
-            "connect-src 'self' https://*.supabase.co; "
-            "img-src 'self' data:; "
-            # Allow esm.sh for CodeMirror fallback in dev only
-            "script-src 'self' 'wasm-unsafe-eval' 'unsafe-eval' https://esm.sh; "
-            "style-src 'self' 'unsafe-inline'; "
-            "worker-src 'self' blob:; "
-            "frame-ancestors 'none'"
-        )
-        self.send_header('Content-Security-Policy', csp)
+        # Queue behind the status line and default headers; the stdlib
+        # flushes the whole buffer with a single write.
+        if hasattr(self, '_headers_buffer'):
+            self._headers_buffer.append(self._HEADERS_BLOB)
         super().end_headers()
 
-    # Use base implementation for content serving
+    def copyfile(self, source, outputfile):
+        if outputfile is not self.wfile:
+            return super().copyfile(source, outputfile)
+        # Headers may still sit in the wfile buffer; push them out before
+        # handing the body to socket.sendfile (zero-copy os.sendfile where
+        # available, plain send() fallback for in-memory listings).
+        self.wfile.flush()
+        self.connection.sendfile(source)
 
 
-class ReuseTCPServer(socketserver.TCPServer):
-    allow_reuse_address = True
+class PlainHandler(Handler):
+    pass
 
 
-def try_bind(host, port, handler_factory):
-    try:
-        httpd = ReuseTCPServer((host, port), handler_factory)
-        return httpd, port
-    except OSError as e:
-        if e.errno == 48 or 'Address already in use' in str(e):
-            return None, None
-        raise
+class IsolatedHandler(Handler):
+    _HEADERS_BLOB = _encode_headers(_STATIC_HEADERS + _isolated_headers('credentialless'))
+
+    @classmethod
+    def with_coep(cls, coep_policy):
+        # Header set is fixed for the server's lifetime, so bake the chosen
+        # COEP policy into a subclass instead of branching per response.
+        return type(f'{cls.__name__}[{coep_policy}]', (cls,), {
+            '_HEADERS_BLOB': _encode_headers(_STATIC_HEADERS + _isolated_headers(coep_policy)),
+        })
+
+
+class ReuseTCPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    # One thread per request so a slow WASM/.data download doesn't stall
+    # the other parallel asset fetches from the page.
+    allow_reuse_address = True
+    daemon_threads = True
+    block_on_close = False
+
+
+class ReusePortTCPServer(ReuseTCPServer):
+    # SO_REUSEPORT lets several --workers processes bind the same port and
+    # have the kernel balance connections between them. Kept off for the
+    # default single process so port probing still skips a running server.
+    allow_reuse_port = True
+
+    def server_bind(self):
+        # socketserver only honours allow_reuse_port from Python 3.11
+        if sys.version_info < (3, 11):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+def _new_socket(reuse_port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    return sock
+
+
+def try_bind(host, ports, backlog, reuse_port=False):
+    # Probe candidate ports with one socket; a failed bind leaves it unbound
+    # so it can simply be retried on the next port. With SO_REUSEADDR two
+    # sockets can both bind a port nobody listens on yet, so the loser only
+    # finds out at listen() -- that one is bound, so start over with a new one.
+    sock = _new_socket(reuse_port)
+    for port in ports:
+        try:
+            sock.bind((host, port))
+            sock.listen(backlog)
+            return sock
+        except OSError as e:
+            if e.errno != errno.EADDRINUSE:
+                sock.close()
+                raise
+            if sock.getsockname()[1] != 0:
+                sock.close()
+                sock = _new_socket(reuse_port)
+    sock.close()
+    return None
+
+
+def server_from_socket(sock, handler_cls, server_cls=ReuseTCPServer):
+    # sock is already bound and listening (see try_bind)
+    httpd = server_cls(sock.getsockname(), handler_cls, bind_and_activate=False)
+    httpd.socket.close()
+    httpd.socket = sock
+    # What HTTPServer.server_bind would have recorded
+    httpd.server_address = sock.getsockname()
+    host, port = httpd.server_address[:2]
+    httpd.server_name = socket.getfqdn(host)
+    httpd.server_port = port
+    return httpd
 
 
 def main():
@@ -66,32 +169,60 @@ def main():
     parser.add_argument('--isolated', action='store_true', help='Enable COOP/COEP (crossOriginIsolated) headers')
     parser.add_argument('--coep', choices=['require-corp','credentialless'], default='credentialless', help='COEP policy when isolated')
     parser.add_argument('--root', default='.')
+    parser.add_argument('--workers', type=int, default=1, help='Number of server processes sharing the port (SO_REUSEPORT)')
     args = parser.parse_args()
+    if args.workers > 1 and not (hasattr(os, 'fork') and hasattr(socket, 'SO_REUSEPORT')):
+        parser.error('--workers requires os.fork and SO_REUSEPORT')
+    server_cls = ReusePortTCPServer if args.workers > 1 else ReuseTCPServer
 
     os.chdir(args.root)
-    handler_factory = lambda *h_args, **h_kwargs: Handler(*h_args, isolated=args.isolated, coep_policy=args.coep, **h_kwargs)
-
-    # Try the requested port first, then search the next 20 ports.
-    httpd, chosen_port = try_bind(args.host, args.port, handler_factory)
-    if httpd is None:
-        for p in range(args.port + 1, args.port + 21):
-            httpd, chosen_port = try_bind(args.host, p, handler_factory)
-            if httpd is not None:
-                break
-
-    # Fall back to OS-assigned port (0)
-    if httpd is None:
-        httpd, chosen_port = try_bind(args.host, 0, handler_factory)
+    handler_cls = IsolatedHandler.with_coep(args.coep) if args.isolated else PlainHandler
 
-    if httpd is None:
+    # Try the requested port first, then the next 20, then an OS-assigned one (0).
+    ports = list(range(args.port, args.port + 21)) + [0]
+    sock = try_bind(args.host, ports, server_cls.request_queue_size, reuse_port=args.workers > 1)
+    if sock is None:
         print("Failed to bind any port. Is another server running?")
         sys.exit(2)
 
-    print(f"Serving {os.getcwd()} on http://{args.host}:{chosen_port} (isolated={args.isolated})")
+    httpd = server_from_socket(sock, handler_cls, server_cls)
+    chosen_port = httpd.server_port
+    worker_pids = []
+    is_worker = False
+    for _ in range(args.workers - 1):
+        pid = os.fork()
+        if pid == 0:
+            # Each worker gets its own listening socket on the same port
+            httpd.server_close()
+            httpd = server_cls((args.host, chosen_port), handler_cls)
+            # Siblings are the parent's to manage, not this worker's
+            worker_pids = []
+            is_worker = True
+            break
+        worker_pids.append(pid)
+
+    if worker_pids:
+        # Unwind through the finally below so workers aren't orphaned
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    if not is_worker:
+        print(f"Serving {os.getcwd()} on http://{args.host}:{chosen_port} (isolated={args.isolated}, workers={args.workers})")
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
-        print("\nShutting down...")
+        if not is_worker:
+            print("\nShutting down...")
+    finally:
+        for pid in worker_pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in worker_pids:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
 
 
 if __name__ == '__main__':
@@ -4,12 +4,54 @@ Python configuration module demonstrating syntax highlighting
 """
 
 import os
+import copy
 import json
+import math
 import logging
+import functools
 from typing import Dict, List, Optional, Union
 from dataclasses import dataclass
 from pathlib import Path
 
+def _json_dumps(obj) -> bytes:
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+def _has_nonfinite(obj) -> bool:
+    """Check for NaN/Infinity, which orjson would write as null"""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_nonfinite(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_nonfinite(v) for v in obj)
+    return False
+
+# Prefer orjson's C parser/serializer when it is installed. Output matches
+# json's apart from float formatting (e.g. 1e16 vs 1e+16), which round-trips.
+try:
+    import orjson
+    
+    def _loads(data: bytes):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity literals that json accepts
+            return json.loads(data)
+    
+    def _dumps(obj) -> bytes:
+        if _has_nonfinite(obj):
+            return _json_dumps(obj)
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # orjson rejects e.g. integers beyond 64 bits; json handles them
+            return _json_dumps(obj)
+except ImportError:
+    def _loads(data: bytes):
+        return json.loads(data)
+    
+    _dumps = _json_dumps
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -18,6 +60,13 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+_REQUIRED_DB_FIELDS = ('host', 'port', 'database', 'username')
+
+@functools.lru_cache(maxsize=256)
+def _split(key: str) -> tuple:
+    """Split a dot-notation key into its path components"""
+    return tuple(key.split('.'))
+
 @dataclass
 class DatabaseConfig:
     """Database configuration settings"""
@@ -30,14 +79,32 @@ class DatabaseConfig:
     
     def to_dict(self) -> Dict[str, Union[str, int]]:
         """Convert to dictionary"""
-        return {
-            'host': self.host,
-            'port': self.port,
-            'database': self.database,
-            'username': self.username,
-            'password': self.password,
-            'ssl_mode': self.ssl_mode
-        }
+        # All fields are primitives, so a shallow copy matches asdict()
+        return self.__dict__.copy()
+
+# Built once; _create_default_config hands out deep copies
+_DEFAULT_CONFIG = {
+    'database': DatabaseConfig().to_dict(),
+    'api': {
+        'host': '0.0.0.0',
+        'port': 8000,
+        'debug': False,
+        'allowed_origins': ['http://localhost:3000']
+    },
+    'cache': {
+        'type': 'redis',
+        'host': 'localhost',
+        'port': 6379,
+        'db': 0,
+        'ttl': 3600
+    },
+    'features': {
+        'enable_auth': True,
+        'enable_logging': True,
+        'enable_metrics': False,
+        'max_file_size': 10 * 1024 * 1024  # 10MB
+    }
+}
 
 class ConfigManager:
     """Manage application configuration"""
@@ -45,56 +112,33 @@ class ConfigManager:
     def __init__(self, config_path: Optional[str] = None):
         self.config_path = Path(config_path or "config.json")
         self.config = {}
+        self._dirty = False
         self._load_config()
     
     def _load_config(self) -> None:
         """Load configuration from file"""
         try:
             if self.config_path.exists():
-                with open(self.config_path, 'r') as f:
-                    self.config = json.load(f)
-                logger.info(f"Loaded config from {self.config_path}")
+                self.config = _loads(self.config_path.read_bytes())
+                logger.info("Loaded config from %s", self.config_path)
             else:
                 logger.warning("Config file not found, using defaults")
                 self._create_default_config()
         except (json.JSONDecodeError, IOError) as e:
-            logger.error(f"Failed to load config: {e}")
+            logger.error("Failed to load config: %s", e)
             raise
     
     def _create_default_config(self) -> None:
         """Create default configuration"""
-        self.config = {
-            'database': DatabaseConfig().to_dict(),
-            'api': {
-                'host': '0.0.0.0',
-                'port': 8000,
-                'debug': False,
-                'allowed_origins': ['http://localhost:3000']
-            },
-            'cache': {
-                'type': 'redis',
-                'host': 'localhost',
-                'port': 6379,
-                'db': 0,
-                'ttl': 3600
-            },
-            'features': {
-                'enable_auth': True,
-                'enable_logging': True,
-                'enable_metrics': False,
-                'max_file_size': 10 * 1024 * 1024  # 10MB
-            }
-        }
+        self.config = copy.deepcopy(_DEFAULT_CONFIG)
         
-        # Save default config
-        self.save_config()
+        # Written on the next flush() rather than from the constructor
+        self._dirty = True
     
     def get(self, key: str, default=None):
         """Get configuration value with dot notation"""
-        keys = key.split('.')
         value = self.config
-        
-        for k in keys:
+        for k in _split(key):
             if isinstance(value, dict) and k in value:
                 value = value[k]
             else:
@@ -102,50 +146,68 @@ class ConfigManager:
         
         return value
     
-    def set(self, key: str, value) -> None:
-        """Set configuration value with dot notation"""
-        keys = key.split('.')
+    def _parent(self, keys: tuple) -> dict:
+        """Walk to the dict holding the last key, creating missing levels"""
         config = self.config
-        
-        # Navigate to parent
         for k in keys[:-1]:
-            if k not in config:
-                config[k] = {}
-            config = config[k]
+            config = config.setdefault(k, {})
+        return config
+    
+    def set(self, key: str, value) -> None:
+        """Set configuration value with dot notation"""
+        keys = _split(key)
+        self._parent(keys)[keys[-1]] = value
+        self._dirty = True
+        logger.info("Updated config: %s = %s", key, value)
+    
+    def bulk_set(self, updates: Dict[str, object]) -> None:
+        """Set several dot-notation keys at once, without per-key logging"""
+        for key, value in updates.items():
+            keys = _split(key)
+            self._parent(keys)[keys[-1]] = value
         
-        # Set the value
-        config[keys[-1]] = value
-        logger.info(f"Updated config: {key} = {value}")
+        if updates:
+            self._dirty = True
     
     def save_config(self) -> None:
         """Save configuration to file"""
         try:
-            with open(self.config_path, 'w') as f:
-                json.dump(self.config, f, indent=2)
-            logger.info(f"Saved config to {self.config_path}")
-        except IOError as e:
-            logger.error(f"Failed to save config: {e}")
+            self.config_path.write_bytes(_dumps(self.config))
+            self._dirty = False
+            logger.info("Saved config to %s", self.config_path)
+        except (TypeError, ValueError, IOError) as e:
+            logger.error("Failed to save config: %s", e)
             raise
     
+    def flush(self) -> None:
+        """Save configuration to file if it has unsaved changes"""
+        if self._dirty:
+            self.save_config()
+    
     def validate_config(self) -> List[str]:
         """Validate configuration and return list of errors"""
         errors = []
         
+        cfg = self.config if isinstance(self.config, dict) else {}
+        
+        def section(name: str) -> dict:
+            value = cfg.get(name)
+            return value if isinstance(value, dict) else {}
+        
         # Validate database config
-        db_config = self.get('database', {})
-        required_db_fields = ['host', 'port', 'database', 'username']
+        db_config = section('database')
         
-        for field in required_db_fields:
+        for field in _REQUIRED_DB_FIELDS:
             if field not in db_config:
                 errors.append(f"Missing required database field: {field}")
         
         # Validate API config
-        api_port = self.get('api.port')
+        api_port = section('api').get('port')
         if not isinstance(api_port, int) or api_port < 1 or api_port > 65535:
             errors.append("Invalid API port number")
         
         # Validate features
-        max_file_size = self.get('features.max_file_size')
+        max_file_size = section('features').get('max_file_size')
         if max_file_size and max_file_size < 1024:
             errors.append("Max file size too small (minimum 1KB)")
         
@@ -156,6 +218,9 @@ config = ConfigManager()
 
 # Example usage and testing
 if __name__ == "__main__":
+    # Write the defaults on first run (set() changes below stay in memory)
+    config.flush()
+    
     print("Configuration Manager Test")
     print("=" * 30)
     
@@ -182,4 +247,4 @@ if __name__ == "__main__":
     config.set('features.new_feature', 'enabled')
     
     print(f"\nUpdated debug mode: {config.get('api.debug')}")
-    print(f"New feature: {config.get('features.new_feature')}")
\ No newline at end of file
+    print(f"New feature: {config.get('features.new_feature')}")